@@ -1,37 +1,52 @@
 from data.sleep_database import SLEEP_ISSUES, get_sleep_issue_info
-from openai import OpenAI
-import json
+from typing import Iterator, Optional
+from functools import lru_cache
+import jsonio
+from batching import get_batcher
 from src.config import Config
+from openai_client import get_client
+
+
+@lru_cache(maxsize=1)
+def _kb() -> dict:
+    """Read the knowledge base once per process."""
+    with open("data/knowledge_base.json", "rb") as f:
+        return jsonio.loads(f.read())
+
+
+@lru_cache(maxsize=1)
+def _facts() -> str:
+    """Join the sleep and exercise facts once, on first use."""
+    return "\n".join(_kb().get("sleep", []) + _kb().get("exercise", []))
+
+
+_ADVICE_TPL = (
+    "You are a professional health coach. Base your advice on scientific facts.\n"
+    "USER CONTEXT: {ctx}\n"
+    "SCIENTIFIC FACTS:\n{facts}\n\n"
+    "Give a detailed but concise advice paragraph, citing at least one scientific source."
+)
+
+_COMBINED_TPL = "USER CONTEXT:\n{ctx}\n\nSCIENTIFIC FACTS:\n{facts}\n\nUSER QUESTION:\n{q}"
 
 class LifestyleAnalyzer:
-    def __init__(self, user_id: str = "default"):
+    def __init__(self, user_id: str = "default", api_key: Optional[str] = None):
         ...
-        self.client = OpenAI(api_key=Config.OPENAI_KEY)
-        self.knowledge_base = self._load_knowledge_base()
-
-    def _load_knowledge_base(self) -> dict:
-        with open("data/knowledge_base.json", "r") as f:
-            return json.load(f)
+        self.api_key = api_key or Config.OPENAI_KEY
+        self.client = get_client(self.api_key)
 
-    def generate_ai_advice(self, user_context: str) -> str:
+    def generate_ai_advice(self, user_context: str) -> Iterator[str]:
         """
         Use OpenAI to generate smarter, science-based advice.
         Args:
             user_context: Summary of user's sleep/exercise situation
         Returns:
-            AI-generated coaching advice.
+            AI-generated coaching advice, streamed as it is generated.
         """
-        facts = "\n".join(self.knowledge_base.get("sleep", []) + self.knowledge_base.get("exercise", []))
-
-        prompt = (
-            f"You are a professional health coach. Base your advice on scientific facts.\n"
-            f"USER CONTEXT: {user_context}\n"
-            f"SCIENTIFIC FACTS:\n{facts}\n\n"
-            "Give a detailed but concise advice paragraph, citing at least one scientific source."
-        )
+        prompt = _ADVICE_TPL.format(ctx=user_context, facts=_facts())
 
         try:
-            response = self.client.chat.completions.create(
+            yield from get_batcher(self.api_key).stream(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are an expert health and lifestyle coach."},
@@ -40,6 +55,33 @@ class LifestyleAnalyzer:
                 temperature=0.5,
                 max_tokens=300
             )
-            return response.choices[0].message.content
         except Exception as e:
-            return f"⚠️ AI advice unavailable: {str(e)}"
+            yield f"⚠️ AI advice unavailable: {str(e)}"
+
+    def generate_combined_coaching(self, user_context: str, question: str) -> Iterator[str]:
+        """
+        Analyze sleep/exercise data and advise the user in a single request.
+        Args:
+            user_context: Combined summary of user's sleep and exercise data
+            question: The user's question
+        Returns:
+            Markdown with "Analysis" and "Advice" sections, streamed as it is generated.
+        """
+        prompt = _COMBINED_TPL.format(ctx=user_context, facts=_facts(), q=question)
+
+        try:
+            yield from get_batcher(self.api_key).stream(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": (
+                        "You're a professional lifestyle coach specialized in sleep and exercise optimization. "
+                        "Analyze how the user's sleep and exercise might be interacting, then give personalized, "
+                        "science-based advice citing at least one scientific source. "
+                        'Format the reply as two markdown sections headed "### Analysis" and "### Advice".'
+                    )},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7
+            )
+        except Exception as e:
+            yield f"⚠️ AI advice unavailable: {str(e)}"
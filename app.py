@@ -2,18 +2,24 @@
 from exercise_planner import ExercisePlanner
 from visualizations import Visualizer
 from config import Config
+from batching import get_batcher
+from openai_client import get_client
+from prefetch import warm
+import store
+import os
 import sys
+import threading
 from pathlib import Path
 
 # Add project root so we can import from data/
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
+from analyzer import LifestyleAnalyzer
+
 import streamlit as st
-import json
 import pandas as pd
 import plotly.express as px
-from openai import OpenAI
-from datetime import datetime
+from datetime import date
 # ======================
 # SETUP & CONFIGURATION
 # ======================
@@ -29,43 +35,63 @@ if "authenticated" not in st.session_state:
 # ======================
 class SleepDataManager:
     def __init__(self, user_id="default"):
-        self.file_path = Path(f"data/{user_id}_sleep.json")
-        self.data = self._load_data()
-
-    def _load_data(self):
-        try:
-            with open(self.file_path, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {"sleep_logs": []}
+        self.user_id = user_id
+        store.import_legacy(store.SLEEP_TABLE, user_id, Path(f"data/{user_id}_sleep.json"), "sleep_logs")
 
     def add_entry(self, hours: float, quality: int, notes: str = ""):
         new_entry = {
-            "date": datetime.now().strftime("%Y-%m-%d"),
+            "date": date.today().isoformat(),
             "hours": hours,
             "quality": quality,
             "notes": notes
         }
-        self.data["sleep_logs"].append(new_entry)
-        self._save_data()
-
-    def _save_data(self):
-        self.file_path.parent.mkdir(exist_ok=True)
-        with open(self.file_path, 'w') as f:
-            json.dump(self.data, f, indent=2)
+        store.insert(store.SLEEP_TABLE, self.user_id, new_entry)
 
     def get_last_entries(self, n=7):
-        return self.data["sleep_logs"][-n:]
+        return store.last_rows(store.SLEEP_TABLE, self.user_id, n)
 
     def get_dataframe(self):
-        return pd.DataFrame(self.data["sleep_logs"])
+        return pd.DataFrame(store.fetch_columns(store.SLEEP_TABLE, self.user_id))
+
+# Kept across reruns so each user's manager (and its legacy import check) is set up once
+@st.cache_resource
+def get_sleep_manager(user_id: str = "default") -> SleepDataManager:
+    return SleepDataManager(user_id)
+
+@st.cache_resource
+def get_exercise_planner(user_id: str = "default") -> ExercisePlanner:
+    return ExercisePlanner(user_id=user_id)
+
+# ======================
+# PREDICTIVE PREFETCH
+# ======================
+PREFETCH_BUDGET_S = 1.5
+
+def _warm_connection(api_key: str):
+    """Open the OpenAI connection ahead of "Get Advice"."""
+    try:
+        # The coaching request reuses this TLS connection from the shared batcher's pool
+        get_batcher(api_key).ping(PREFETCH_BUDGET_S)
+    except Exception:
+        pass
+
+def start_prewarm():
+    """Warm the connection once per API key in the background unless disabled with COACH_PREFETCH=off."""
+    if os.environ.get("COACH_PREFETCH", "on").lower() == "off" or not st.session_state.get("api_key_valid"):
+        return
+
+    api_key = st.session_state.client.api_key
+    if st.session_state.get("_connection_warmed") == api_key:
+        return
+    st.session_state._connection_warmed = api_key
+    threading.Thread(target=_warm_connection, args=(api_key,), daemon=True).start()
 
 # ======================
 # AI CHATBOT
 # ======================
 def initialize_chatbot(api_key: str):
     try:
-        client = OpenAI(api_key=api_key)
+        client = get_client(api_key)
         client.models.list()  # Test the API key
         st.session_state.api_key_valid = True
         return client
@@ -80,7 +106,7 @@ def generate_coach_response(client, question: str, sleep_data: list):
         for log in sleep_data
     )
     
-    response = client.chat.completions.create(
+    return get_batcher(client.api_key).stream(
         model="gpt-3.5-turbo",
         messages=[
             {"role": "system", "content": "You're a compassionate lifestyle coach. Provide specific advice based on the user's sleep data."},
@@ -88,7 +114,6 @@ def generate_coach_response(client, question: str, sleep_data: list):
         ],
         temperature=0.7
     )
-    return response.choices[0].message.content
 
 # ======================
 # VISUALIZATIONS
@@ -110,10 +135,26 @@ def plot_sleep_data(df):
     fig.update_yaxes(title_text="Hours/Quality (%)")
     return fig
 
+# Rebuilt only when a new sleep or exercise entry changes the ids in the key
+@st.cache_data(max_entries=8)
+def exercise_figures(user_id: str, last_sleep_id: int, last_exercise_id: int) -> list:
+    visualizer = Visualizer(user_id=user_id)
+    figures = (visualizer.plot_exercise_distribution(), visualizer.plot_exercise_time_vs_sleep_quality())
+    return [fig for fig in figures if fig is not None]
+
 # ======================
 # STREAMLIT UI
 # ======================
 def main():
+    # Start reading the app's data files while the page renders
+    if "prefetched" not in st.session_state:
+        warm([
+            str(store.DB_PATH),
+            f"{store.DB_PATH}-wal",
+            "data/knowledge_base.json",
+        ])
+        st.session_state.prefetched = True
+
     # Sidebar - API Key and Authentication
     with st.sidebar:
         st.header("🔑 API Configuration")
@@ -130,8 +171,10 @@ def main():
     # Main App Interface
     st.title("🌙 Sleep Lifestyle Coach")
     
-    # Initialize data manager
-    manager = SleepDataManager()
+    # Data managers are cached across reruns
+    manager = get_sleep_manager("default")
+    planner = get_exercise_planner("default")
+    start_prewarm()
     
     # Tab System
     tab1, tab2, tab3, tab4 = st.tabs(["Sleep Logger", "Trends Dashboard", "AI Coach", "Exercise Planner"])
@@ -164,6 +207,14 @@ def main():
             st.metric("Average Sleep", f"{avg_hours:.1f} hours")
         else:
             st.info("No sleep data yet. Log some sleep in the first tab!")
+
+        # Exercise charts render client-side with Plotly
+        for fig in exercise_figures(
+            "default",
+            store.last_id(store.SLEEP_TABLE, "default"),
+            store.last_id(store.EXERCISE_TABLE, "default")
+        ):
+            st.plotly_chart(fig, use_container_width=True)
     with tab3:
         st.header("Ask Your Lifestyle Coach")
 
@@ -171,18 +222,13 @@ def main():
             st.warning("Please enter a valid API key in the sidebar")
             return
 
-    # Initialize ExercisePlanner if not already
-        if "exercise_planner" not in st.session_state:
-            st.session_state.exercise_planner = ExercisePlanner(user_id="default")
-
         question = st.text_input("What would you like to know about your sleep and exercise habits?")
 
         if question and st.button("Get Advice"):
             with st.spinner("Analyzing your lifestyle patterns..."):
-            # Load recent sleep entries
+            # Load the last 7 sleep entries and this week's exercise summary
                 last_sleep_entries = manager.get_last_entries(7)
-            # Load recent exercise entries
-                exercise_summary = st.session_state.exercise_planner.get_weekly_summary()
+                exercise_summary = planner.get_weekly_summary()
 
             # Create a richer context for OpenAI
                 sleep_context = "\n".join(
@@ -199,29 +245,17 @@ def main():
             # Combine both contexts
                 full_context = (
                 f"User Sleep Data (Last 7 Days):\n{sleep_context}\n\n"
-                f"User Exercise Data (Last 7 Days):\n{exercise_context}\n\n"
-                "Analyze how sleep and exercise might be interacting, and give the user personalized advice."
+                f"User Exercise Data (Last 7 Days):\n{exercise_context}"
             )
 
-            # Send to OpenAI
-                response = st.session_state.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                    {"role": "system", "content": "You're a professional lifestyle coach specialized in sleep and exercise optimization."},
-                    {"role": "user", "content": f"{full_context}\n\nQuestion: {question}"}
-                    ],
-                    temperature=0.7
-            )
+            # Analysis and advice come back from one OpenAI request
+                analyzer = LifestyleAnalyzer(api_key=st.session_state.client.api_key)
 
                 st.subheader("Coach's Response")
-                st.write(response.choices[0].message.content)
+                st.write_stream(analyzer.generate_combined_coaching(full_context, question))
     with tab4:
         st.header("🏃‍♂️ Exercise Planner")
     
-    # Initialize Exercise Planner
-        if "exercise_planner" not in st.session_state:
-            st.session_state.exercise_planner = ExercisePlanner(user_id="default")
-    
     # Exercise Logging Form
         with st.form("exercise_form"):
             activity = st.selectbox("Activity Type", ["Cardio", "Walking", "Running", "Fitness Class", "Other"])
@@ -230,12 +264,12 @@ def main():
             submit_exercise = st.form_submit_button("Log Exercise")
         
             if submit_exercise:
-                st.session_state.exercise_planner.log_exercise(activity_type=activity, duration_hours=duration, notes=notes)
+                planner.log_exercise(activity_type=activity, duration_hours=duration, notes=notes)
                 st.success(f"Logged {activity} for {duration} hours!")
 
     # Weekly Exercise Summary
         st.subheader("Weekly Exercise Summary")
-        summary = st.session_state.exercise_planner.get_weekly_summary()
+        summary = planner.get_weekly_summary()
     
         if summary:
             st.metric("Total Exercise Time", f"{summary['total_hours']} hours")
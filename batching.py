@@ -0,0 +1,202 @@
+# src/batching.py
+import asyncio
+import concurrent.futures
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+import httpx
+from openai import AsyncOpenAI, AsyncStream
+from openai_client import LIMITS
+
+MAX_BATCH = 8
+MAX_WAIT_MS = 50
+REQUEST_TIMEOUT_S = 60
+STARTUP_TIMEOUT_S = 10
+MAX_BATCHERS = 4
+
+
+class PromptBatcher:
+    """
+    Collects chat completion requests from concurrent Streamlit sessions and
+    dispatches them together over one shared async client.
+
+    Chat completions take a single conversation per request, so a "batch" is
+    sent as parallel requests sharing one connection pool rather than one
+    combined payload.
+    """
+
+    def __init__(self, api_key: str, max_batch: int = MAX_BATCH, max_wait_ms: int = MAX_WAIT_MS):
+        """
+        Args:
+            api_key: OpenAI API key used by the shared async client
+            max_batch: Most requests dispatched together
+            max_wait_ms: How long to wait for a batch to fill up
+        """
+        self.api_key = api_key
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        # Built on the caller's thread so a missing h2 or a rejected key raises here
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=httpx.AsyncClient(http2=True, limits=LIMITS)
+        )
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+        threading.Thread(target=self._run, daemon=True).start()
+        if not self._ready.wait(STARTUP_TIMEOUT_S):
+            raise RuntimeError("Prompt batcher event loop did not start")
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        """Own the event loop in a background thread."""
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._queue: asyncio.Queue = asyncio.Queue()
+            self._tasks: Set[asyncio.Task] = set()
+            self._drainer = self._loop.create_task(self._drain())
+        except BaseException as e:
+            self._error = e
+            self._loop.close()
+            return
+        finally:
+            self._ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    def close(self):
+        """Close the HTTP client and stop the event loop without waiting for either."""
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+
+    async def _shutdown(self):
+        """Cancel queued and in-flight work, then release the connection pool."""
+        tasks = (self._drainer, *self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.client.close()
+        self._loop.stop()
+
+    async def _submit(self, request: Dict[str, Any]) -> Any:
+        """Queue a request and wait for its response."""
+        future = self._loop.create_future()
+        await self._queue.put((request, future))
+        return await future
+
+    async def _drain(self):
+        """Gather up to max_batch requests within max_wait and send them together."""
+        while True:
+            batch: List[Tuple[Dict[str, Any], asyncio.Future]] = [await self._queue.get()]
+            deadline = self._loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Send the batch without waiting for it, so a slow request never holds up the next batch
+            task = self._loop.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        """Send one batch, answering each caller as soon as its own response arrives."""
+        # Similar-length prompts finish together, so send shortest first
+        batch.sort(key=lambda item: sum(len(m["content"]) for m in item[0]["messages"]))
+        await asyncio.gather(*(self._send(request, future) for request, future in batch))
+
+    async def _send(self, request: Dict[str, Any], future: asyncio.Future):
+        """Send one request and resolve its future."""
+        try:
+            result = await self.client.chat.completions.create(**request)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        if not future.done():
+            future.set_result(result)
+        elif isinstance(result, AsyncStream):
+            # The caller gave up; close the unread stream so its connection is released
+            await result.close()
+
+    def _wait(self, coro, timeout: float) -> Any:
+        """Run a coroutine on the loop and block for at most timeout seconds."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def ping(self, timeout: float) -> None:
+        """Open a pooled connection with an unbilled request (listing models)."""
+        self._wait(self._list_models(), timeout)
+
+    async def _list_models(self):
+        await self.client.models.list()
+
+    def complete(self, **request) -> Any:
+        """
+        Submit a chat completion and block until it is answered.
+        Args:
+            request: Keyword arguments for chat.completions.create
+        Returns:
+            The chat completion response.
+        """
+        timeout = request.get("timeout", REQUEST_TIMEOUT_S) + self.max_wait
+        return self._wait(self._submit(request), timeout)
+
+    def stream(self, **request) -> Iterator[str]:
+        """
+        Submit a streaming chat completion and yield text as it arrives.
+        Args:
+            request: Keyword arguments for chat.completions.create
+        Returns:
+            Iterator over content deltas.
+        """
+        chunks = self.complete(stream=True, **request)
+        timeout = request.get("timeout", REQUEST_TIMEOUT_S)
+        try:
+            while True:
+                chunk = self._wait(_next_chunk(chunks), timeout)
+                if chunk is None:
+                    return
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Release the connection even if the reader stops early
+            asyncio.run_coroutine_threadsafe(chunks.close(), self._loop)
+
+
+_batchers: "OrderedDict[str, PromptBatcher]" = OrderedDict()
+_batchers_lock = threading.Lock()
+
+
+async def _next_chunk(chunks) -> Any:
+    """Read the next chunk of an async stream, or None once it is exhausted."""
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+def get_batcher(api_key: str) -> PromptBatcher:
+    """
+    Return the process-wide batcher for an API key.
+    Only the MAX_BATCHERS most recently used keys keep a batcher; older ones are closed.
+    """
+    with _batchers_lock:
+        batcher = _batchers.get(api_key)
+        if batcher is not None:
+            _batchers.move_to_end(api_key)
+            return batcher
+
+        batcher = _batchers[api_key] = PromptBatcher(api_key)
+        if len(_batchers) > MAX_BATCHERS:
+            _batchers.popitem(last=False)[1].close()
+        return batcher
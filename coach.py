@@ -1,12 +1,20 @@
 # src/coach.py
-from data.sleep_database import get_sleep_issue_info  # <-- New import
-import json
+from data.sleep_database import get_structured_advice
 from datetime import datetime, timedelta
 from typing import Dict
 from pathlib import Path
-import pandas as pd
-from openai import OpenAI
+import numpy as np
 from config import Config
+from openai_client import get_client
+import store
+
+_COACH_TPL = (
+    "You are a professional sleep coach.\n"
+    "USER CONTEXT:\n{ctx}\n\n"
+    "KNOWN SLEEP ISSUE:\n{adv}\n\n"
+    "USER QUESTION:\n{q}\n\n"
+    "Respond with specific, actionable, compassionate advice. Cite the structured advice where helpful."
+)
 
 class SleepCoach:
     def __init__(self, user_id: str = "default"):
@@ -15,23 +23,24 @@ class SleepCoach:
         Args:
             user_id: Unique identifier for user data isolation
         """
-        self.data_path = Path(f"data/processed/{user_id}_sleep.json")
-        self.data = self._load_data()
-        self.client = OpenAI(api_key=Config.OPENAI_KEY)
-
-    def _load_data(self) -> Dict:
-        """Load user's sleep data from JSON file."""
-        try:
-            with open(self.data_path, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {"sleep_logs": [], "goals": {}}
-
-    def _save_data(self):
-        """Persist data to JSON file."""
-        self.data_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.data_path, 'w') as f:
-            json.dump(self.data, f, indent=2)
+        self.user_id = user_id
+        self._import_legacy()
+        # Weekly report cache, invalidated whenever an entry is logged
+        self._version = 0
+        self._cache = {}
+        self.client = get_client(Config.OPENAI_KEY)
+
+    def _import_legacy(self):
+        """Copy sleep logs and goals from the old JSON file into the database once."""
+        legacy_json = Path(f"data/processed/{self.user_id}_sleep.json")
+        store.import_legacy(store.COACH_SLEEP_TABLE, self.user_id, legacy_json, "sleep_logs")
+        store.import_legacy_goals(self.user_id, legacy_json)
+
+    def _goals(self) -> Dict:
+        """Load the user's goals."""
+        return dict(store.get_conn().execute(
+            "SELECT goal_type, target FROM goals WHERE user_id = ?", (self.user_id,)
+        ).fetchall())
 
     def log_sleep(self, hours: float, quality: int, notes: str = "") -> None:
         """Record a new sleep entry."""
@@ -41,49 +50,65 @@ class SleepCoach:
             "quality": quality,
             "notes": notes
         }
-        self.data["sleep_logs"].append(new_entry)
-        self._save_data()
+        store.insert(store.COACH_SLEEP_TABLE, self.user_id, new_entry)
+        self._version += 1
+        self._cache.clear()
 
     def get_weekly_report(self) -> Dict:
         """Generate weekly sleep statistics."""
-        df = pd.DataFrame(self.data["sleep_logs"])
-        if df.empty:
-            return {}
-
-        df['date'] = pd.to_datetime(df['date'])
-        last_week = df[df['date'] > (datetime.now() - timedelta(days=7))]
-
-        if last_week.empty:
+        # The 7-day window moves with the clock, so cached reports also expire each minute
+        now = datetime.now()
+        key = (self._version, now.replace(second=0, microsecond=0))
+        # One lookup: a concurrent log entry may clear the cache between a check and a read
+        report = self._cache.get(key)
+        if report is None:
+            report = self._weekly_report((now - timedelta(days=7)).isoformat())
+            self._cache = {key: report}
+        return report
+
+    def _weekly_report(self, cutoff: str) -> Dict:
+        """Aggregate the sleep log since cutoff in the database."""
+        avg_hours, avg_quality, count = store.get_conn().execute(
+            "SELECT avg(hours), avg(quality), count(*) FROM coach_sleep_log WHERE user_id = ? AND date > ?",
+            (self.user_id, cutoff)
+        ).fetchone()
+        if not count:
             return {}
 
         return {
-            "avg_hours": round(last_week['hours'].mean(), 1),
-            "avg_quality": int(last_week['quality'].mean()),
-            "consistency_score": self._calculate_consistency(last_week),
+            "avg_hours": round(avg_hours, 1),
+            "avg_quality": int(avg_quality),
+            "consistency_score": self._calculate_consistency(cutoff) if count > 1 else 0,
         }
 
-    def _calculate_consistency(self, df: pd.DataFrame) -> float:
+    def _calculate_consistency(self, cutoff: str) -> float:
         """Calculate sleep schedule consistency (0-100 scale)."""
-        if len(df) < 2:
+        hours = np.fromiter((row[0] for row in store.get_conn().execute(
+            "SELECT hours FROM coach_sleep_log WHERE user_id = ? AND date > ? ORDER BY date, id", (self.user_id, cutoff)
+        )), dtype=float)
+        if len(hours) < 2:
             return 0
-        hour_diffs = abs(df['hours'].diff().mean())
+        hour_diffs = abs(float(np.diff(hours).mean()))
         return max(0, 100 - (hour_diffs * 10))
 
     def set_goal(self, goal_type: str, target: float) -> None:
         """Set a sleep-related goal."""
-        self.data["goals"][goal_type] = target
-        self._save_data()
+        store.get_conn().execute(
+            "INSERT OR REPLACE INTO goals (user_id, goal_type, target) VALUES (?, ?, ?)",
+            (self.user_id, goal_type, target)
+        )
 
     def check_goals(self) -> Dict:
         """Compare recent performance against goals."""
         report = self.get_weekly_report()
-        if not report or not self.data["goals"]:
+        goals = self._goals()
+        if not report or not goals:
             return {}
 
         results = {}
         for goal_type in ['hours', 'quality']:
-            if goal_type in self.data["goals"]:
-                target = self.data["goals"][goal_type]
+            if goal_type in goals:
+                target = goals[goal_type]
                 actual = report.get(f"avg_{goal_type}", 0)
                 difference = actual - target
                 results[goal_type] = {
@@ -103,29 +128,14 @@ class SleepCoach:
         """
         context = "\n".join(
             f"{log['date'][:10]}: {log['hours']}h, {log['quality']}/100 quality"
-            for log in self.data["sleep_logs"][-3:]  # Last 3 entries
+            for log in store.last_rows(store.COACH_SLEEP_TABLE, self.user_id, 3)  # Last 3 entries
         )
 
         # Pull structured expert advice from sleep_database
-        issue_info = get_sleep_issue_info(sleep_issue)
-
-        if not issue_info:
-            structured_advice = "No specific structured advice available."
-        else:
-            structured_advice = (
-                f"Problem: {issue_info['description']}\n"
-                "Recommended actions:\n"
-                + "\n".join(f"- {tip}" for tip in issue_info["recommendations"])
-            )
+        structured_advice = get_structured_advice(sleep_issue)
 
         # Build the full prompt
-        full_prompt = (
-            f"You are a professional sleep coach.\n"
-            f"USER CONTEXT:\n{context}\n\n"
-            f"KNOWN SLEEP ISSUE:\n{structured_advice}\n\n"
-            f"USER QUESTION:\n{prompt}\n\n"
-            "Respond with specific, actionable, compassionate advice. Cite the structured advice where helpful."
-        )
+        full_prompt = _COACH_TPL.format(ctx=context, adv=structured_advice, q=prompt)
 
         try:
             response = self.client.chat.completions.create(
@@ -135,9 +145,14 @@ class SleepCoach:
                     {"role": "user", "content": full_prompt}
                 ],
                 temperature=0.5,
-                max_tokens=300
+                max_tokens=300,
+                stream=True
+            )
+            return "".join(
+                chunk.choices[0].delta.content or ""
+                for chunk in response
+                if chunk.choices
             )
-            return response.choices[0].message.content
         except Exception as e:
             return f"⚠️ Coaching unavailable: {str(e)}"
 
@@ -1,9 +1,12 @@
 # src/exercise_planner.py
-import json
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
-import pandas as pd
+import numpy as np
+import store
+
+INTERVAL_EDGES = np.array([2, 4, 6])
+INTERVAL_LABELS = ("0-2 hours", "2-4 hours", "4-6 hours", "6+ hours")
 
 class ExercisePlanner:
     def __init__(self, user_id: str = "default"):
@@ -12,22 +15,14 @@ class ExercisePlanner:
         Args:
             user_id: Unique identifier for user data isolation
         """
-        self.data_path = Path(f"data/processed/{user_id}_exercise.json")
-        self.data = self._load_data()
-
-    def _load_data(self) -> Dict:
-        """Load exercise data from a JSON file."""
-        try:
-            with open(self.data_path, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {"exercise_logs": []}
-
-    def _save_data(self):
-        """Save exercise data back to the JSON file."""
-        self.data_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.data_path, 'w') as f:
-            json.dump(self.data, f, indent=2)
+        self.user_id = user_id
+        # Weekly summary cache, invalidated whenever an entry is logged
+        self._version = 0
+        self._cache = {}
+        # Copy entries from the old JSON file into the database once
+        store.import_legacy(
+            store.EXERCISE_TABLE, user_id, Path(f"data/processed/{user_id}_exercise.json"), "exercise_logs"
+        )
 
     def log_exercise(self, activity_type: str, duration_hours: float, notes: str = "") -> None:
         """
@@ -46,8 +41,9 @@ class ExercisePlanner:
             "duration_hours": round(duration_hours, 2),
             "notes": notes
         }
-        self.data["exercise_logs"].append(new_entry)
-        self._save_data()
+        store.insert(store.EXERCISE_TABLE, self.user_id, new_entry)
+        self._version += 1
+        self._cache.clear()
 
     def get_weekly_summary(self) -> Dict[str, any]:
         """
@@ -55,24 +51,30 @@ class ExercisePlanner:
         Returns:
             Dictionary including total time spent, number of sessions, and activity breakdown.
         """
-        df = pd.DataFrame(self.data["exercise_logs"])
-        if df.empty:
+        # The 7-day window moves with the clock, so cached summaries also expire each minute
+        now = datetime.now()
+        key = (self._version, now.replace(second=0, microsecond=0))
+        # One lookup: a concurrent log entry may clear the cache between a check and a read
+        summary = self._cache.get(key)
+        if summary is None:
+            summary = self._weekly_summary((now - timedelta(days=7)).isoformat())
+            self._cache = {key: summary}
+        return summary
+
+    def _weekly_summary(self, cutoff: str) -> Dict[str, any]:
+        """Aggregate the exercise log since cutoff in the database."""
+        rows = store.get_conn().execute(
+            "SELECT activity_type, count(*), sum(duration_hours) FROM exercise_log "
+            "WHERE user_id = ? AND date > ? GROUP BY activity_type ORDER BY count(*) DESC, min(id)",
+            (self.user_id, cutoff)
+        ).fetchall()
+        if not rows:
             return {}
 
-        df['date'] = pd.to_datetime(df['date'])
-        last_week = df[df['date'] > (datetime.now() - timedelta(days=7))]
-
-        if last_week.empty:
-            return {}
-
-        total_hours = round(last_week['duration_hours'].sum(), 2)
-        sessions = len(last_week)
-        activity_counts = last_week['activity_type'].value_counts().to_dict()
-
         return {
-            "total_hours": total_hours,
-            "sessions": sessions,
-            "activity_breakdown": activity_counts
+            "total_hours": round(sum(row[2] for row in rows), 2),
+            "sessions": sum(row[1] for row in rows),
+            "activity_breakdown": {activity: count for activity, count, _ in rows}
         }
 
     def get_exercise_intervals(self) -> Dict[str, int]:
@@ -81,28 +83,17 @@ class ExercisePlanner:
         Returns:
             Dictionary of interval counts.
         """
-        df = pd.DataFrame(self.data["exercise_logs"])
-        if df.empty:
+        durations = np.fromiter((row[0] for row in store.get_conn().execute(
+            "SELECT duration_hours FROM exercise_log WHERE user_id = ?", (self.user_id,)
+        )), dtype=float)
+        if not durations.size:
             return {}
 
-        intervals = {
-            "0-2 hours": 0,
-            "2-4 hours": 0,
-            "4-6 hours": 0,
-            "6+ hours": 0
-        }
-
-        for duration in df['duration_hours']:
-            if duration <= 2:
-                intervals["0-2 hours"] += 1
-            elif duration <= 4:
-                intervals["2-4 hours"] += 1
-            elif duration <= 6:
-                intervals["4-6 hours"] += 1
-            else:
-                intervals["6+ hours"] += 1
+        # Intervals are closed on the right (2.0 hours counts as "0-2 hours"),
+        # which searchsorted against the upper edges reproduces
+        counts = np.bincount(np.searchsorted(INTERVAL_EDGES, durations, side="left"), minlength=len(INTERVAL_LABELS))
 
-        return intervals
+        return {label: int(count) for label, count in zip(INTERVAL_LABELS, counts)}
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,34 @@
+# src/jsonio.py
+# JSON helpers backed by orjson; swap the import below to fall back to stdlib json.
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+    import json
+
+if orjson is not None:
+    JSONDecodeError = orjson.JSONDecodeError
+
+    def loads(data: Any) -> Any:
+        """Parse JSON from str or bytes."""
+        return orjson.loads(data)
+
+    def dumps(obj: Any, indent: bool = False) -> bytes:
+        """
+        Serialize obj to UTF-8 JSON bytes, optionally indented by 2 spaces.
+        Non-str dict keys are converted to strings, as the stdlib json module does.
+        """
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+else:
+    JSONDecodeError = json.JSONDecodeError
+
+    def loads(data: Any) -> Any:
+        """Parse JSON from str or bytes."""
+        return json.loads(data)
+
+    def dumps(obj: Any, indent: bool = False) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes, optionally indented by 2 spaces."""
+        return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
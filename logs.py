@@ -0,0 +1,39 @@
+# src/logs.py
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+SLEEP_FIELDS = ("date", "hours", "quality", "notes")
+EXERCISE_FIELDS = ("date", "activity_type", "duration_hours", "notes")
+# Fields stored in numeric columns
+NUMERIC_FIELDS = frozenset({"hours", "quality", "duration_hours"})
+
+Columns = Dict[str, List[Any]]
+
+
+def empty_columns(fields: Sequence[str]) -> Columns:
+    """Create an empty column store with one list per field."""
+    return {field: [] for field in fields}
+
+
+def _valid(field: str, value: Any) -> bool:
+    """Check that a legacy value fits its database column."""
+    if field in NUMERIC_FIELDS:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, str)
+
+
+def legacy_rows(entries: List[Dict[str, Any]], fields: Sequence[str]) -> Iterator[Tuple[Any, ...]]:
+    """
+    Convert entries from the old JSON log files into database rows.
+    Args:
+        entries: List of entry dicts
+        fields: Field names every entry carries
+    Returns:
+        Iterator over value tuples in field order. Notes default to "";
+        entries missing any other field, or holding a value of the wrong type, are skipped.
+    """
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        row = tuple(entry.get(field, "") if field == "notes" else entry.get(field) for field in fields)
+        if all(_valid(field, value) for field, value in zip(fields, row)):
+            yield row
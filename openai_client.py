@@ -0,0 +1,21 @@
+# src/openai_client.py
+from functools import lru_cache
+import httpx
+from openai import OpenAI
+
+# Shared by the sync client and the async batcher; HTTP/2 multiplexes
+# concurrent requests over one connection. Idle connections stay open long enough
+# for a warmed-up session to type its first question.
+LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=120)
+
+
+@lru_cache(maxsize=4)
+def get_client(api_key: str) -> OpenAI:
+    """
+    Return the process-wide OpenAI client for an API key.
+    Args:
+        api_key: OpenAI API key
+    Returns:
+        OpenAI client reusing one HTTP/2 connection pool.
+    """
+    return OpenAI(api_key=api_key, http_client=httpx.Client(http2=True, limits=LIMITS))
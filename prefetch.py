@@ -0,0 +1,25 @@
+# src/prefetch.py
+import os
+from typing import Iterable
+
+
+def warm(paths: Iterable[str]) -> None:
+    """
+    Ask the OS to start reading files into the page cache ahead of use.
+    Missing files and platforms without posix_fadvise (e.g. Windows) are skipped.
+    Args:
+        paths: Files that are about to be read
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
@@ -1,4 +1,4 @@
-import json
+import jsonio
 from pathlib import Path
 from typing import Dict, Any
 
@@ -20,9 +20,9 @@ def load_user_data(filename: str) -> Dict[str, Any]:
         return {}
 
     try:
-        with open(path, "r") as file:
-            return json.load(file)
-    except json.JSONDecodeError:
+        with open(path, "rb") as file:
+            return jsonio.loads(file.read())
+    except jsonio.JSONDecodeError:
         return {}
 
 def save_user_data(filename: str, data: Dict[str, Any]) -> None:
@@ -31,5 +31,5 @@ def save_user_data(filename: str, data: Dict[str, Any]) -> None:
     """
     path = DATA_DIR / filename
     path.parent.mkdir(parents=True, exist_ok=True)  # Ensure folder still exists
-    with open(path, "w") as file:
-        json.dump(data, file, indent=2)
\ No newline at end of file
+    with open(path, "wb") as file:
+        file.write(jsonio.dumps(data, indent=True))
\ No newline at end of file
@@ -1,6 +1,8 @@
 # data/sleep_database.py
 
-from typing import Dict, Any
+import sys
+import types
+from typing import Dict, Any, Mapping
 
 SLEEP_ISSUES = {
     "difficulty_falling_asleep": {
@@ -41,7 +43,7 @@ SLEEP_ISSUES = {
     }
 }
 
-def get_sleep_issue_info(issue_key: str) -> Dict[str, Any]:
+def get_sleep_issue_info(issue_key: str) -> Mapping[str, Any]:
     """
     Retrieve structured information about a specific sleep problem.
     
@@ -49,6 +51,34 @@ def get_sleep_issue_info(issue_key: str) -> Dict[str, Any]:
         issue_key (str): The key identifying the sleep issue (e.g., 'difficulty_falling_asleep')
     
     Returns:
-        dict: Dictionary containing description and recommendations, or empty dict if not found.
+        Mapping: Read-only mapping containing description and recommendations, or empty dict if not found.
     """
     return SLEEP_ISSUES.get(issue_key, {})
+
+# Prompt-ready advice per issue, formatted once at import
+FROZEN_ADVICE: Dict[str, str] = {
+    key: f"Problem: {info['description']}\nRecommended actions:\n"
+    + "\n".join(f"- {tip}" for tip in info["recommendations"])
+    for key, info in SLEEP_ISSUES.items()
+}
+
+def get_structured_advice(issue_key: str) -> str:
+    """
+    Retrieve the pre-formatted advice text for a sleep problem.
+    
+    Args:
+        issue_key (str): The key identifying the sleep issue (e.g., 'difficulty_falling_asleep')
+    
+    Returns:
+        str: Problem description and recommended actions, or a fallback message if not found.
+    """
+    return FROZEN_ADVICE.get(issue_key, "No specific structured advice available.")
+
+# SLEEP_ISSUES is read-only: share interned strings and expose it through read-only views
+SLEEP_ISSUES = types.MappingProxyType({
+    key: types.MappingProxyType({
+        "description": sys.intern(info["description"]),
+        "recommendations": tuple(sys.intern(tip) for tip in info["recommendations"]),
+    })
+    for key, info in SLEEP_ISSUES.items()
+})
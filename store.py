@@ -0,0 +1,182 @@
+# src/store.py
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+import jsonio
+from logs import EXERCISE_FIELDS, SLEEP_FIELDS, Columns, empty_columns, legacy_rows
+
+DB_PATH = Path("data/app.db")
+
+SLEEP_TABLE = "sleep_log"
+# SleepCoach kept its own sleep file, separate from the app's, so it gets its own table
+COACH_SLEEP_TABLE = "coach_sleep_log"
+EXERCISE_TABLE = "exercise_log"
+FIELDS = {SLEEP_TABLE: SLEEP_FIELDS, COACH_SLEEP_TABLE: SLEEP_FIELDS, EXERCISE_TABLE: EXERCISE_FIELDS}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sleep_log (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    hours REAL NOT NULL,
+    quality INTEGER NOT NULL,
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS sleep_log_user_date ON sleep_log (user_id, date);
+CREATE TABLE IF NOT EXISTS coach_sleep_log (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    hours REAL NOT NULL,
+    quality INTEGER NOT NULL,
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS coach_sleep_log_user_date ON coach_sleep_log (user_id, date);
+CREATE TABLE IF NOT EXISTS exercise_log (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    activity_type TEXT NOT NULL,
+    duration_hours REAL NOT NULL,
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS exercise_log_user_date ON exercise_log (user_id, date);
+CREATE TABLE IF NOT EXISTS goals (
+    user_id TEXT NOT NULL,
+    goal_type TEXT NOT NULL,
+    target REAL NOT NULL,
+    PRIMARY KEY (user_id, goal_type)
+);
+CREATE TABLE IF NOT EXISTS migrations (source TEXT PRIMARY KEY);
+"""
+
+_local = threading.local()
+_setup_lock = threading.Lock()
+_setup_done = False
+
+
+def _setup(conn: sqlite3.Connection) -> None:
+    """Switch the database to WAL and create the tables, once per process."""
+    global _setup_done
+    with _setup_lock:
+        if not _setup_done:
+            # WAL is stored in the database file, so later connections inherit it
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _setup_done = True
+
+
+def get_conn() -> sqlite3.Connection:
+    """
+    Return this thread's connection to the app database, creating it on first use.
+    Connections run in autocommit mode on a WAL journal so readers never block the writer.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, isolation_level=None)
+        _setup(conn)
+        _local.conn = conn
+    return conn
+
+
+def insert(table: str, user_id: str, entry: Dict[str, Any]) -> None:
+    """Append one log entry for a user."""
+    fields = FIELDS[table]
+    get_conn().execute(
+        f"INSERT INTO {table} (user_id, {', '.join(fields)}) VALUES (?{', ?' * len(fields)})",
+        (user_id, *(entry[field] for field in fields))
+    )
+
+
+def fetch_columns(table: str, user_id: str) -> Columns:
+    """Return all of a user's log entries as column lists, oldest first."""
+    fields = FIELDS[table]
+    rows = get_conn().execute(
+        f"SELECT {', '.join(fields)} FROM {table} WHERE user_id = ? ORDER BY date, id", (user_id,)
+    ).fetchall()
+    return {field: list(values) for field, values in zip(fields, zip(*rows))} if rows else empty_columns(fields)
+
+
+def last_rows(table: str, user_id: str, n: int) -> List[Dict[str, Any]]:
+    """Return a user's last n log entries as dicts, oldest first."""
+    fields = FIELDS[table]
+    rows = get_conn().execute(
+        f"SELECT {', '.join(fields)} FROM {table} WHERE user_id = ? ORDER BY date DESC, id DESC LIMIT ?", (user_id, n)
+    ).fetchall()
+    return [dict(zip(fields, row)) for row in reversed(rows)]
+
+
+def last_id(table: str, user_id: str) -> int:
+    """Return the id of a user's newest log entry, or 0; it changes whenever an entry is added."""
+    return get_conn().execute(f"SELECT max(id) FROM {table} WHERE user_id = ?", (user_id,)).fetchone()[0] or 0
+
+
+def _imported(conn: sqlite3.Connection, source: str) -> bool:
+    """Check whether a legacy file has already been copied into the database."""
+    return conn.execute("SELECT 1 FROM migrations WHERE source = ?", (source,)).fetchone() is not None
+
+
+def _import_once(conn: sqlite3.Connection, source: str, sql: str, rows: List[Sequence[Any]]) -> None:
+    """
+    Insert a legacy file's rows and record it in migrations as one write transaction.
+    BEGIN IMMEDIATE takes the write lock before the migrations check, so two sessions
+    importing the same file cannot both insert its rows.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if not _imported(conn, source):
+            conn.executemany(sql, rows)
+            conn.execute("INSERT INTO migrations (source) VALUES (?)", (source,))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def import_legacy(table: str, user_id: str, path: Path, key: str) -> None:
+    """
+    Copy log entries from an old JSON file into the database, once.
+    Args:
+        table: Destination log table
+        user_id: Owner of the entries
+        path: Legacy .json file
+        key: Key holding the list of entries
+    """
+    conn = get_conn()
+    source = f"{table}:{path}"
+    if not path.exists() or _imported(conn, source):
+        return
+    fields = FIELDS[table]
+    try:
+        with open(path, 'rb') as f:
+            entries = jsonio.loads(f.read()).get(key, [])
+    except jsonio.JSONDecodeError:
+        entries = []
+    _import_once(
+        conn, source,
+        f"INSERT INTO {table} (user_id, {', '.join(fields)}) VALUES (?{', ?' * len(fields)})",
+        [(user_id, *row) for row in legacy_rows(entries, fields)]
+    )
+
+
+def import_legacy_goals(user_id: str, path: Path) -> None:
+    """Copy goals from an old JSON file into the database, once."""
+    conn = get_conn()
+    source = f"goals:{path}"
+    if not path.exists() or _imported(conn, source):
+        return
+    try:
+        with open(path, 'rb') as f:
+            goals = jsonio.loads(f.read()).get("goals", {})
+    except jsonio.JSONDecodeError:
+        goals = {}
+    _import_once(
+        conn, source,
+        "INSERT OR REPLACE INTO goals (user_id, goal_type, target) VALUES (?, ?, ?)",
+        [
+            (user_id, goal_type, target) for goal_type, target in goals.items()
+            if isinstance(target, (int, float)) and not isinstance(target, bool)
+        ]
+    )
@@ -1,109 +1,100 @@
-# Ensure required libraries are installed: pandas, matplotlib, seaborn, json
+# Ensure required libraries are installed: pandas, numpy, plotly
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from pathlib import Path
-import json
 from typing import Optional
 import plotly.express as px
+import plotly.graph_objects as go
+import store
 
 class Visualizer:
     def __init__(self, user_id: str = "default"):
         self.user_id = user_id
-        self.sleep_data = self._load_data(f"data/{user_id}_sleep.json", "sleep_logs")
-        self.exercise_data = self._load_data(f"data/{user_id}_exercise.json", "exercise_logs")
-
-    def _load_data(self, path: str, key: str) -> pd.DataFrame:
-        try:
-            with open(path, 'r') as f:
-                data = json.load(f)
-            df = pd.DataFrame(data.get(key, []))
-            if not df.empty and 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'])
-            return df
-        except (FileNotFoundError, json.JSONDecodeError):
+        self.sleep_data = self._load_data(store.SLEEP_TABLE)
+        self.exercise_data = self._load_data(store.EXERCISE_TABLE)
+
+    def _load_data(self, table: str) -> pd.DataFrame:
+        columns = store.fetch_columns(table, self.user_id)
+        if not columns['date']:
             return pd.DataFrame()
+        df = pd.DataFrame(columns)
+        df['date'] = pd.to_datetime(df['date'], format="ISO8601")
+        return df
 
-    def plot_sleep_hours_trend(self):
+    def plot_sleep_hours_trend(self) -> Optional[go.Figure]:
         """Plot user's sleep hours over time."""
         if self.sleep_data.empty:
-            print("No sleep data available.")
-            return
-
-        plt.figure(figsize=(10, 5))
-        sns.lineplot(data=self.sleep_data, x="date", y="hours", marker="o")
-        plt.title("Sleep Duration Over Time")
-        plt.ylabel("Hours Slept")
-        plt.xlabel("Date")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.show()
-
-    def plot_sleep_quality_trend(self):
+            return None
+
+        fig = go.Figure(go.Scattergl(x=self.sleep_data["date"], y=self.sleep_data["hours"], mode="lines+markers"))
+        fig.update_layout(title="Sleep Duration Over Time", xaxis_title="Date", yaxis_title="Hours Slept")
+        return fig
+
+    def plot_sleep_quality_trend(self) -> Optional[go.Figure]:
         """Plot sleep quality trend over time."""
         if self.sleep_data.empty:
-            print("No sleep data available.")
-            return
-
-        plt.figure(figsize=(10, 5))
-        sns.lineplot(data=self.sleep_data, x="date", y="quality", marker="o", color="green")
-        plt.title("Sleep Quality Over Time")
-        plt.ylabel("Quality (0-100)")
-        plt.xlabel("Date")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.show()
-
-    def plot_exercise_distribution(self):
+            return None
+
+        fig = go.Figure(go.Scattergl(
+            x=self.sleep_data["date"], y=self.sleep_data["quality"], mode="lines+markers", line_color="green"
+        ))
+        fig.update_layout(title="Sleep Quality Over Time", xaxis_title="Date", yaxis_title="Quality (0-100)")
+        return fig
+
+    def plot_exercise_distribution(self) -> Optional[go.Figure]:
         """Show distribution of exercise types."""
         if self.exercise_data.empty:
-            print("No exercise data available.")
-            return
-
-        plt.figure(figsize=(8, 5))
-        sns.countplot(data=self.exercise_data, x="activity", order=self.exercise_data['activity'].value_counts().index, palette="pastel")
-        plt.title("Exercise Types Frequency")
-        plt.ylabel("Sessions")
-        plt.xlabel("Activity Type")
-        plt.xticks(rotation=30)
-        plt.tight_layout()
-        plt.show()
-
-    def plot_exercise_time_vs_sleep_quality(self):
+            return None
+
+        counts = self.exercise_data['activity_type'].value_counts()
+        fig = px.bar(
+            x=counts.index, y=counts.values, color=counts.index,
+            color_discrete_sequence=px.colors.qualitative.Pastel,
+            labels={"x": "Activity Type", "y": "Sessions"},
+            title="Exercise Types Frequency"
+        )
+        fig.update_layout(showlegend=False)
+        return fig
+
+    def plot_exercise_time_vs_sleep_quality(self) -> Optional[go.Figure]:
         """Analyze relationship between time spent exercising and sleep quality."""
         if self.sleep_data.empty or self.exercise_data.empty:
-            print("Insufficient data for combined analysis.")
-            return
-
-        combined = pd.merge_asof(
-            self.sleep_data.sort_values('date'),
-            self.exercise_data.sort_values('date'),
-            on='date',
-            direction='backward',
-            tolerance=pd.Timedelta('1D')  # assume exercise affects next sleep
-        )
+            return None
+
+        sleep = self.sleep_data.sort_values('date')
+        exercise = self.exercise_data.sort_values('date')
+        sleep_dates = sleep['date'].values.astype('datetime64[D]')
+        exercise_dates = exercise['date'].values.astype('datetime64[D]')
+
+        # Pair each night with the latest exercise on or up to a day before it
+        # (assume exercise affects next sleep)
+        idx = np.searchsorted(exercise_dates, sleep_dates, side='right') - 1
+        matched = (idx >= 0) & (sleep_dates - exercise_dates[np.maximum(idx, 0)] <= np.timedelta64(1, 'D'))
+        idx = idx[matched]
+
+        combined = pd.DataFrame({
+            "quality": sleep['quality'].values[matched],
+            "duration_hours": exercise['duration_hours'].values[idx],
+            "activity": exercise['activity_type'].values[idx],
+        })
 
         if combined.empty:
-            print("No matched data to analyze.")
-            return
-
-        plt.figure(figsize=(10, 6))
-        sns.scatterplot(data=combined, x="duration_hours", y="quality", hue="activity", palette="muted")
-        plt.title("Exercise Duration vs Sleep Quality")
-        plt.xlabel("Exercise Duration (hours)")
-        plt.ylabel("Sleep Quality (0-100)")
-        plt.tight_layout()
-        plt.show()
-
-    def plot_goal_tracking(self, goals: Optional[dict] = None):
+            return None
+
+        fig = px.scatter(
+            combined, x="duration_hours", y="quality", color="activity",
+            color_discrete_sequence=px.colors.qualitative.Safe, render_mode="webgl",
+            labels={"duration_hours": "Exercise Duration (hours)", "quality": "Sleep Quality (0-100)"},
+            title="Exercise Duration vs Sleep Quality"
+        )
+        return fig
+
+    def plot_goal_tracking(self, goals: Optional[dict] = None) -> Optional[go.Figure]:
         """Visualize how user is performing against goals."""
         if self.sleep_data.empty:
-            print("No sleep data available.")
-            return
+            return None
 
         if not goals:
-            print("No goals provided for visualization.")
-            return
+            return None
 
         avg_sleep = self.sleep_data['hours'].mean()
         avg_quality = self.sleep_data['quality'].mean()
@@ -116,9 +107,9 @@ class Visualizer:
 
         df_melt = df.melt(id_vars="Metric", value_vars=["Current", "Target"], var_name="Type", value_name="Value")
 
-        plt.figure(figsize=(8, 5))
-        sns.barplot(data=df_melt, x="Metric", y="Value", hue="Type", palette="deep")
-        plt.title("Goal Tracking Overview")
-        plt.ylabel("Value")
-        plt.tight_layout()
-        plt.show()
+        fig = px.bar(
+            df_melt, x="Metric", y="Value", color="Type", barmode="group",
+            color_discrete_sequence=px.colors.qualitative.D3,
+            title="Goal Tracking Overview"
+        )
+        return fig